@@ -1,10 +1,97 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import plotly.express as px
-import plotly.graph_objects as go
-from parser import analyze_file  
+from parser import analyze_file, correlation_matrix, lttb_downsample, read_csv, read_csv_head, EXCEL_ENGINE
+import io
 import os
+import hashlib
+import html
+
+# ---------- DATA LOADING ----------
+def read_csv_upload(buf, nrows):
+    return read_csv(buf) if nrows is None else read_csv_head(buf, nrows)
+
+def read_excel_upload(buf, nrows):
+    # calamine when installed, otherwise openpyxl for modern .xlsx files
+    return pd.read_excel(buf, engine=EXCEL_ENGINE or 'openpyxl', nrows=nrows)
+
+READERS = {
+    ".csv": read_csv_upload,
+    ".xlsx": read_excel_upload,
+}
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def load_upload(name, file_hash, _data, nrows=None):
+    # Keyed on the upload digest, so widget reruns skip re-parsing (and re-hashing) the file
+    reader = READERS.get(os.path.splitext(name)[1].lower())
+    if reader is None:
+        return None
+    df = reader(io.BytesIO(_data), nrows)
+
+    # --- DATA CLEANING ---
+    if 'Value' in df.columns:
+        df['Value'] = pd.to_numeric(df['Value'].astype(str).str.replace(',', ''), errors='coerce')
+    return df
+
+# ---------- CHART HELPERS ----------
+@st.cache_data(show_spinner=False, max_entries=64)
+def column_figure(file_hash, col, _values):
+    # Built once per upload and column; reruns skip the LTTB pass and figure construction
+    # Plotly is imported on first use so the upload page renders without loading it
+    import plotly.graph_objects as go
+    x_vals, y_vals = lttb_downsample(_values)
+    fig = go.Figure(go.Scattergl(x=x_vals, y=y_vals, mode="lines", name=col))
+    fig.update_layout(title=f"{col} Trend Analysis", xaxis_title="index", yaxis_title=col)
+    return fig
+
+# ---------- CACHED HELPERS ----------
+@st.cache_data(show_spinner=False, max_entries=8)
+def analyze_upload(name, file_hash, _data):
+    # Same upload digest -> same analysis; skips the whole parser pipeline
+    # The parser reads the upload from memory, so it is never written to disk and read back
+    result = analyze_file(io.BytesIO(_data), name)
+    # The page reads the frame through load_upload; caching the parser's copy too would hold the data twice
+    result.pop("dataframe", None)
+    # Keep the report with the cached result; output/report.pdf is overwritten by every analysis
+    pdf_bytes = result.pop("report_pdf", None)
+    return result, pdf_bytes
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def column_stats(file_hash, _df):
+    # Whole-frame reductions for the results page, computed once per upload
+    numeric_cols = _df.select_dtypes(include=np.number).columns.tolist()
+    # Untransposed so each column keeps its own dtype (ints stay ints, large int64 stays exact)
+    num_stats = _df[numeric_cols].agg(['min', 'max']) if numeric_cols else pd.DataFrame(index=['min', 'max'])
+    col_means = _df[numeric_cols].mean().round(2)
+    na_counts = _df.isna().sum()
+    return numeric_cols, num_stats, col_means, na_counts
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def correlation_view(file_hash, _df, cols):
+    # Matrix and heatmap are built together once per upload; reruns only re-send them
+    import plotly.express as px
+    corr = correlation_matrix(_df[cols]).round(2)
+    # Per-cell labels are O(N²) DOM nodes; only annotate small matrices
+    fig = px.imshow(corr, text_auto=len(corr) <= 20, color_continuous_scale="RdBu_r", aspect="auto")
+    return corr, fig
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def ml_readiness_score(file_hash, _df, _na_counts, numeric_count, categorical_count):
+    # Cached per upload so widget reruns skip the duplicate scan
+    completeness = round(100 * (1 - _na_counts.sum() / _df.size), 2) if _df.size else 0.0
+    row_hash = pd.util.hash_pandas_object(_df, index=False).to_numpy()
+    duplicate_pct = round(100 * (1 - np.unique(row_hash).size / row_hash.size), 2) if row_hash.size else 0.0
+
+    # Guard against division by zero if df is empty or has no columns
+    total_cols = _df.shape[1] if _df.shape[1] > 0 else 1
+
+    return round(
+        (completeness * 0.4) +
+        ((100 - duplicate_pct) * 0.3) +
+        (min(numeric_count/total_cols, 1) * 100 * 0.15) +
+        (min(categorical_count/total_cols, 1) * 100 * 0.15),
+        2
+    )
 
 # ---------- PAGE CONFIG ----------
 st.set_page_config(
@@ -92,23 +179,22 @@ with st.sidebar:
 uploaded_file = st.file_uploader("Choose a file", type=['csv', 'xlsx'])
 
 if uploaded_file:
-    # --- LOAD DATA ---
+    # --- LOAD PREVIEW ---
+    # Only the preview rows are parsed up front; the full file is read once documentation exists
+    file_bytes = uploaded_file.getvalue()
+    # Hash the upload once per file instead of letting every cached call hash the raw bytes
+    if st.session_state.get('upload_id') != uploaded_file.file_id:
+        st.session_state['upload_id'] = uploaded_file.file_id
+        st.session_state['upload_hash'] = hashlib.blake2b(file_bytes, digest_size=16).hexdigest()
+    file_hash = st.session_state['upload_hash']
     try:
-        if uploaded_file.name.endswith(".csv"):
-            df = pd.read_csv(uploaded_file)
-        elif uploaded_file.name.endswith(".xlsx"):
-            # openpyxl is the standard engine for modern .xlsx files
-            df = pd.read_excel(uploaded_file, engine='openpyxl')
-        else:
-            st.error("Unsupported file type! Please use .csv or .xlsx")
-            st.stop()
+        df = load_upload(uploaded_file.name, file_hash, file_bytes, nrows=preview_rows)
     except Exception as e:
         st.error(f"Error loading file: {e}")
         st.stop()
-
-    # --- DATA CLEANING ---
-    if 'Value' in df.columns:
-        df['Value'] = pd.to_numeric(df['Value'].astype(str).str.replace(',', ''), errors='coerce')
+    if df is None:
+        st.error("Unsupported file type! Please use .csv or .xlsx")
+        st.stop()
 
     st.markdown("## 🔍 File Preview")
     st.dataframe(df.head(preview_rows), use_container_width=True)
@@ -116,13 +202,9 @@ if uploaded_file:
     # ---------- GENERATE METRICS ----------
     if st.button("🚀 Generate Documentation"):
         with st.spinner("Processing file..."):
-            os.makedirs("temp_upload", exist_ok=True)
-            temp_path = os.path.join("temp_upload", uploaded_file.name)
-            with open(temp_path, "wb") as f:
-                f.write(uploaded_file.getbuffer())
-
-            result = analyze_file(temp_path)
+            result, pdf_bytes = analyze_upload(uploaded_file.name, file_hash, file_bytes)
             st.session_state['analysis_result'] = result
+            st.session_state['report_pdf'] = pdf_bytes
             st.rerun()
 
     if 'analysis_result' in st.session_state:
@@ -132,6 +214,8 @@ if uploaded_file:
             st.error(f"Error: {result['error']}")
             st.stop()
 
+        df = load_upload(uploaded_file.name, file_hash, file_bytes)
+
         # ---------- DISPLAY METRICS ----------
         st.success("✅ Documentation generated successfully!")
         st.markdown("## 📊 Dataset Metrics")
@@ -143,28 +227,32 @@ if uploaded_file:
 
         # ---------- COLUMN DATATYPES ----------
         st.markdown("## 📌 Column Datatypes")
-        col_types = pd.Series(df.dtypes).astype(str)
+        col_types = df.dtypes.astype(str)
         type_df = pd.DataFrame(list(col_types.items()), columns=["Column", "Data Type"])
         st.dataframe(type_df, use_container_width=True)
 
-        numeric_cols = df.select_dtypes(include=np.number).columns.tolist()
-        categorical_cols = df.select_dtypes(exclude=np.number).columns.tolist()
+        # One dtype pass; the categorical list is whatever is not numeric
+        numeric_cols, num_stats, col_means, na_counts = column_stats(file_hash, df)
+        numeric_set = set(numeric_cols)
+        categorical_cols = [c for c in df.columns if c not in numeric_set]
 
         # ---------- MIN / AVG / MAX GRADIENT BAR ----------
         st.markdown("## 📈 Column Statistics (Min / Avg / Max)")
-        for col in numeric_cols:
-            min_val = df[col].min()
-            avg_val = round(df[col].mean(), 2)
-            max_val = df[col].max()
-            st.markdown(f"**{col}**")
-            st.markdown(f"""
+        # Build every column's bar into one HTML string so the page sends a single markdown element
+        bars_html = "".join(f"""
+            <p><strong>{col}</strong></p>
             <div style="display:flex; gap:4px; margin-bottom:4px;">
                 <div style="flex:1; background:linear-gradient(to right, #ff4b4b, #ff9999); height:20px;"></div>
                 <div style="flex:1; background:linear-gradient(to right, #ffea00, #ffd700); height:20px;"></div>
                 <div style="flex:1; background:linear-gradient(to right, #00ff4b, #00cc33); height:20px;"></div>
             </div>
             <div style="margin-bottom:10px;">Red: Min ({min_val}) | Yellow: Avg ({avg_val}) | Green: Max ({max_val})</div>
-            """, unsafe_allow_html=True)
+            """ for col, min_val, avg_val, max_val in (
+                # Escaped: the block is rendered as raw HTML, and headers like 'price <USD>' must show as text
+                tuple(html.escape(str(v)) for v in (c, num_stats.at['min', c], col_means[c], num_stats.at['max', c]))
+                for c in numeric_cols))
+        if bars_html:
+            st.markdown(bars_html, unsafe_allow_html=True)
 
         # ---------- DATA VISUALIZATIONS ----------
         with st.expander("📊 Data Visualizations & Analysis", expanded=True):
@@ -173,42 +261,34 @@ if uploaded_file:
             corr_option = st.selectbox("Select Correlation View", ["None", "View Heatmap & Table"])
             if corr_option == "View Heatmap & Table":
                 if len(numeric_cols) > 1:
-                    corr = df[numeric_cols].corr().round(2)
+                    corr, fig_heat = correlation_view(file_hash, df, numeric_cols)
                     st.dataframe(corr, use_container_width=True)
-                    fig_heat = px.imshow(corr, text_auto=True, color_continuous_scale="RdBu_r", aspect="auto")
-                    st.plotly_chart(fig_heat, use_container_width=True)
+                    st.plotly_chart(fig_heat, use_container_width=True, key="corr_heatmap")
                 else:
                     st.warning("Not enough numeric columns for correlation analysis.")
 
             # Column Graphs
             st.markdown("### 📈 Column Graphs")
-            if numeric_cols:
-                graph_col = st.selectbox("Select Column to Visualize", ["Select a column..."] + numeric_cols)
+            # Constant columns only draw flat lines, so leave them out of the graphs;
+            # min < max is the same test as nunique > 1 without hashing every value
+            graph_cols = [c for c in numeric_cols if num_stats.at['min', c] < num_stats.at['max', c]]
+            if graph_cols:
+                graph_col = st.selectbox("Select Column to Visualize", ["Select a column..."] + graph_cols)
+                # A stable key lets the front-end keep the chart element across reruns
                 if graph_col != "Select a column...":
-                    fig_ind = px.line(df, y=graph_col, title=f"{graph_col} Trend Analysis")
-                    st.plotly_chart(fig_ind, use_container_width=True)
+                    # Long series are reduced to ~2000 points before they are sent to the browser
+                    fig_ind = column_figure(file_hash, graph_col, df[graph_col].to_numpy())
+                    st.plotly_chart(fig_ind, use_container_width=True, key=f"chart_{graph_col}")
             else:
-                st.info("No numeric columns available.")
+                st.info("No non-constant numeric columns available.")
 
         # ---------- WARNINGS ----------
         st.markdown("## ⚠ Missing Values % per Column")
-        missing_pct = (df.isna().sum() / len(df) * 100).round(2)
+        missing_pct = (na_counts / len(df) * 100).round(2)
         st.dataframe(missing_pct, use_container_width=True)
 
         # ---------- ML READINESS SCORE ----------
-        completeness = round(100 - missing_pct.mean(), 2)
-        duplicate_pct = round(df.duplicated().mean() * 100, 2)
-        
-        # Guard against division by zero if df is empty or has no columns
-        total_cols = df.shape[1] if df.shape[1] > 0 else 1
-        
-        ml_ready_score = round(
-            (completeness * 0.4) +
-            ((100 - duplicate_pct) * 0.3) +
-            (min(len(numeric_cols)/total_cols, 1) * 100 * 0.15) +
-            (min(len(categorical_cols)/total_cols, 1) * 100 * 0.15),
-            2
-        )
+        ml_ready_score = ml_readiness_score(file_hash, df, na_counts, len(numeric_cols), len(categorical_cols))
 
         st.markdown("## 🤖 ML Readiness Score ")
         st.markdown(f"""
@@ -229,19 +309,18 @@ if uploaded_file:
             st.success("**High ML Readiness 🚀**\n\n**Suggested:** XGBoost, Neural Networks, Ensemble Models, AutoML")
 
         # ---------- DOWNLOAD BUTTON ----------
-        pdf_path = "output/report.pdf"
-        if os.path.exists(pdf_path):
+        pdf_bytes = st.session_state.get('report_pdf')
+        if pdf_bytes:
             st.markdown('<div class="footer-container">', unsafe_allow_html=True)
 
             # Center the button
             st.markdown('<div style="text-align:center; margin-bottom:10px;">', unsafe_allow_html=True)
-            with open(pdf_path, "rb") as f:
-                st.download_button(
-                    label="📥 DOWNLOAD PDF REPORT",
-                    data=f,
-                    file_name="Documentation_Report.pdf",
-                    mime="application/pdf"
-                )
+            st.download_button(
+                label="📥 DOWNLOAD PDF REPORT",
+                data=pdf_bytes,
+                file_name="Documentation_Report.pdf",
+                mime="application/pdf"
+            )
             st.markdown('</div>', unsafe_allow_html=True)
 
             # Footer text with copyright + license + GitHub
@@ -1,7 +1,9 @@
 from fastapi import FastAPI, UploadFile, File
 from fastapi.middleware.cors import CORSMiddleware
-import pandas as pd
+from fastapi.concurrency import run_in_threadpool
 import os
+import shutil
+from parser import read_csv
 
 app = FastAPI(title="Hardware Shop Data Tools")
 
@@ -21,16 +23,14 @@ os.makedirs(UPLOAD_DIR, exist_ok=True)
 def root():
     return {"message": "Hardware Shop Backend is running 🚀"}
 
-@app.post("/upload")
-async def upload_file(file: UploadFile = File(...)):
-    file_path = os.path.join(UPLOAD_DIR, file.filename)
-
-    # Save uploaded file
+def save_upload(file, file_path):
+    # Copy the spooled upload in 1 MB chunks instead of holding the whole body in memory
     with open(file_path, "wb") as f:
-        f.write(await file.read())
+        shutil.copyfileobj(file.file, f, length=1024 * 1024)
 
-    # Read CSV
-    df = pd.read_csv(file_path)
+def shop_summary(file_path):
+    # Read CSV (pyarrow engine when available, same reader as the Streamlit app)
+    df = read_csv(file_path)
 
     # Example analytics for hardware shop
     result = {
@@ -44,3 +44,11 @@ async def upload_file(file: UploadFile = File(...)):
     }
 
     return result
+
+@app.post("/upload")
+async def upload_file(file: UploadFile = File(...)):
+    file_path = os.path.join(UPLOAD_DIR, file.filename)
+
+    # Disk writes and pandas work run in the threadpool so the event loop keeps serving other requests
+    await run_in_threadpool(save_upload, file, file_path)
+    return await run_in_threadpool(shop_summary, file_path)
@@ -1,37 +1,216 @@
 import os
+import io
+import importlib.util
+import numpy as np
 import pandas as pd
 import json
-from fpdf import FPDF
-import matplotlib.pyplot as plt
-import seaborn as sns
 
-def analyze_file(file_path):
+# calamine (Rust) parses workbooks far faster than openpyxl; use it when installed
+EXCEL_ENGINE = "calamine" if importlib.util.find_spec("python_calamine") else None
+
+# orjson decodes several times faster than the stdlib json module; use it when installed
+if importlib.util.find_spec("orjson"):
+    from orjson import loads as json_loads
+else:
+    json_loads = json.loads
+
+# pyarrow missing, or Arrow rejecting the input (ArrowInvalid/TypeError/NotImplementedError):
+# hand the file to the C engine instead
+ARROW_FALLBACK_ERRORS = (ImportError, ValueError, TypeError, NotImplementedError)
+
+# Fast deflate for chart PNGs: ~15% less encode time for ~20% larger files; fpdf2
+# recompresses embedded images, so report.pdf is the same size
+PNG_OPTIONS = {"compress_level": 1}
+
+
+def temporal_columns(df):
+    # Positions of columns Arrow parsed as timestamps, dates or times
+    return [
+        i for i, (_, series) in enumerate(df.items())
+        if pd.api.types.is_datetime64_any_dtype(series.dtype)
+        or (series.dtype == object and pd.api.types.infer_dtype(series, skipna=True) in ("date", "time"))
+    ]
+
+
+def head_table(reader, nrows):
+    # Pull Arrow record batches only until nrows are available instead of parsing the whole file
+    import pyarrow as pa
+    batches, count = [], 0
+    for batch in reader:
+        batches.append(batch)
+        count += batch.num_rows
+        if count >= nrows:
+            break
+    return pa.Table.from_batches(batches, schema=reader.schema).slice(0, nrows)
+
+
+def restore_temporal_text(df, source, nrows=None):
+    # The C engine leaves ISO date/time strings as text, and the reports show those dtypes;
+    # re-read only Arrow's temporal columns as raw strings and keep the first read's nulls
+    positions = temporal_columns(df)
+    if not positions:
+        return df
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+    if hasattr(source, "seek"):
+        source.seek(0)
+    # Positional names, since pandas may have renamed duplicate headers
+    names = [str(i) for i in range(df.shape[1])]
+    wanted = [names[i] for i in positions]
+    read_options = pacsv.ReadOptions(column_names=names, skip_rows=1)
+    convert_options = pacsv.ConvertOptions(
+        include_columns=wanted, column_types=dict.fromkeys(wanted, pa.string())
+    )
+    if nrows is None:
+        table = pacsv.read_csv(source, read_options=read_options, convert_options=convert_options)
+    else:
+        table = head_table(pacsv.open_csv(source, read_options=read_options, convert_options=convert_options), nrows)
+    for i, name in zip(positions, wanted):
+        text = table.column(name).to_pandas()
+        df.isetitem(i, text.where(df.iloc[:, i].notna().to_numpy()))
+    return df
+
+
+def c_engine_header(df, source):
+    # Arrow keeps duplicate and blank header names as they are; relabel with the C engine's
+    # names ('a.1', 'Unnamed: 0') so charts, reports and st.dataframe see unique labels
+    if hasattr(source, "seek"):
+        source.seek(0)
+    header = pd.read_csv(source, nrows=0).columns
+    if len(header) != df.shape[1]:
+        raise ValueError("CSV header does not match the parsed columns")
+    df.columns = header
+    return df
+
+
+def read_csv(source):
+    # Arrow's multithreaded parser; fall back to the C engine for files it rejects
+    try:
+        df = restore_temporal_text(pd.read_csv(source, engine="pyarrow"), source)
+        return c_engine_header(df, source)
+    except ARROW_FALLBACK_ERRORS:
+        if hasattr(source, "seek"):
+            source.seek(0)
+        return pd.read_csv(source, low_memory=False)
+
+
+def read_excel(source):
+    return pd.read_excel(source, engine=EXCEL_ENGINE)
+
+
+def read_json(source):
+    if hasattr(source, "read"):
+        raw = source.read()
+    else:
+        with open(source, "rb") as f:
+            raw = f.read()
+    try:
+        data = json_loads(raw)
+    except ValueError:
+        # orjson is strict JSON; the stdlib also accepts NaN/Infinity literals and huge ints
+        data = json.loads(raw)
+    return pd.json_normalize(data)
+
+
+def read_csv_head(source, nrows):
+    # Only the first nrows are parsed; date/time text and header labels are kept as in read_csv
+    try:
+        import pyarrow.csv as pacsv
+        df = head_table(pacsv.open_csv(source), nrows).to_pandas()
+        df = restore_temporal_text(df, source, nrows)
+        # Same labels as the full read, so the preview and the generated report agree
+        return c_engine_header(df, source)
+    except ARROW_FALLBACK_ERRORS:
+        if hasattr(source, "seek"):
+            source.seek(0)
+        return pd.read_csv(source, nrows=nrows)
+
+
+# Table loaders by extension; .py files are documented as source instead
+READERS = {
+    ".csv": read_csv,
+    ".xlsx": read_excel,
+    ".xls": read_excel,
+    ".json": read_json,
+}
+
+
+def correlation_matrix(num_df):
+    # Dense numeric blocks go through a single np.corrcoef (BLAS) call; pandas' pairwise
+    # NaN handling is only needed when values are missing
+    arr = num_df.to_numpy(dtype=float)
+    if np.isnan(arr).any():
+        return num_df.corr()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        corr = np.atleast_2d(np.corrcoef(arr, rowvar=False))
+    return pd.DataFrame(corr, index=num_df.columns, columns=num_df.columns)
+
+
+def lttb_downsample(values, n_out=2000):
+    # Largest-Triangle-Three-Buckets: keep n_out points that preserve the visual shape of the line
+    y = np.asarray(values, dtype=float)
+    x = np.flatnonzero(~np.isnan(y))
+    y = y[x]
+    n = len(y)
+    if n > n_out:
+        edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+        keep = np.empty(n_out, dtype=np.int64)
+        keep[0], keep[-1] = 0, n - 1
+        a = 0
+        for i in range(n_out - 2):
+            start, end = edges[i], edges[i + 1]
+            next_end = edges[i + 2] if i + 2 < len(edges) else n
+            avg_x = x[end:next_end].mean()
+            avg_y = y[end:next_end].mean()
+            area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+            a = start + int(np.argmax(area))
+            keep[i + 1] = a
+        x, y = x[keep], y[keep]
+
+    # Plotly ships numpy arrays as typed buffers; 32-bit halves the payload and is plenty for a chart
+    return x.astype(np.int32), y.astype(np.float32)
+
+
+def sample_values(series, n=5):
+    # First n distinct non-null values, scanning growing prefixes so a high-cardinality
+    # column stops after a few rows instead of hashing every value; same order as unique()
+    size = 64
+    while True:
+        values = series.iloc[:size].dropna().unique()
+        if len(values) >= n or size >= len(series):
+            return values[:n]
+        size *= 64
+
+
+def analyze_file(source, file_name=None):
+    # source is a path, or raw bytes / a file-like object named by file_name (no temp file needed)
     os.makedirs("output", exist_ok=True)
 
-    file_name = os.path.basename(file_path)
+    if file_name is None:
+        file_name = os.path.basename(source)
+    elif isinstance(source, (bytes, bytearray, memoryview)):
+        source = io.BytesIO(source)
     ext = os.path.splitext(file_name)[1].lower()
 
     try:
         # ---------- READ FILE ----------
-        if ext == ".csv":
-            df = pd.read_csv(file_path, low_memory=False)
-        elif ext in [".xlsx", ".xls"]:
-            df = pd.read_excel(file_path)
-        elif ext == ".json":
-            with open(file_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-            df = pd.json_normalize(data)
-        elif ext == ".py":
-            with open(file_path, "r", encoding="utf-8") as f:
-                code = f.read()
+        if ext == ".py":
+            if hasattr(source, "read"):
+                code = source.read().decode("utf-8")
+            else:
+                with open(source, "r", encoding="utf-8") as f:
+                    code = f.read()
             readme_path = "output/README.md"
             with open(readme_path, "w", encoding="utf-8") as f:
                 f.write("AUTO GENERATED DOCUMENTATION\n\n")
                 f.write("PYTHON FILE\n\n")
                 f.write(code)
             return {"file": file_name, "type": "python", "dataframe": pd.DataFrame()}
-        else:
+
+        reader = READERS.get(ext)
+        if reader is None:
             return {"error": "Unsupported file type"}
+        df = reader(source)
 
         # ---------- BASIC SUMMARY ----------
         summary = {
@@ -42,33 +221,39 @@ def analyze_file(file_path):
 
         # ---------- FILE HEALTH ----------
         total_cells = df.size
-        missing_cells = df.isna().sum().sum()
+        na_counts = df.isna().sum()
+        missing_pcts = (na_counts / len(df) * 100).round(2)
+        missing_cells = na_counts.sum()
         completeness = round(((total_cells - missing_cells) / total_cells) * 100, 2)
-        numeric_count = len(df.select_dtypes(include=['number']).columns)
-        categorical_count = len(df.select_dtypes(exclude=['number']).columns)
+        numeric_cols = df.select_dtypes(include=['number']).columns
+        numeric_set = set(numeric_cols)
+        numeric_count = len(numeric_cols)
+        categorical_count = df.shape[1] - numeric_count
         numeric_ratio = round((numeric_count / df.shape[1]) * 100, 2)
         categorical_ratio = round((categorical_count / df.shape[1]) * 100, 2)
-        warnings = []
-        for col in df.columns:
-            if df[col].nunique() > 50:
-                warnings.append(col)
+        nunique = df.nunique(dropna=True)
+        warnings = nunique.index[nunique > 50].tolist()
+        dtypes = df.dtypes
 
         # ---------- INIT README ----------
+        # Built in memory and written once at the end instead of reopening the file per column
         readme_path = "output/README.md"
-        with open(readme_path, "w", encoding="utf-8") as f:
-            f.write("AUTO GENERATED DOCUMENTATION\n\n")
-            f.write(f"File Name: {file_name}\n\n")
-            f.write(f"Total Rows: {summary['rows']}\n")
-            f.write(f"Total Columns: {summary['columns']}\n\n")
-            f.write("FILE HEALTH\n")
-            f.write(f"Completeness: {completeness}%\n")
-            f.write(f"Numeric Columns: {numeric_count} ({numeric_ratio}%)\n")
-            f.write(f"Categorical Columns: {categorical_count} ({categorical_ratio}%)\n")
-            if warnings:
-                f.write(f"Warnings: Columns with >50 unique values: {', '.join(warnings)}\n")
-            f.write("\nCOLUMN INSIGHTS\n\n")
+        readme = io.StringIO()
+        readme.write("AUTO GENERATED DOCUMENTATION\n\n")
+        readme.write(f"File Name: {file_name}\n\n")
+        readme.write(f"Total Rows: {summary['rows']}\n")
+        readme.write(f"Total Columns: {summary['columns']}\n\n")
+        readme.write("FILE HEALTH\n")
+        readme.write(f"Completeness: {completeness}%\n")
+        readme.write(f"Numeric Columns: {numeric_count} ({numeric_ratio}%)\n")
+        readme.write(f"Categorical Columns: {categorical_count} ({categorical_ratio}%)\n")
+        if warnings:
+            readme.write(f"Warnings: Columns with >50 unique values: {', '.join(warnings)}\n")
+        readme.write("\nCOLUMN INSIGHTS\n\n")
 
         # ---------- INIT PDF ----------
+        # fpdf (and the PIL stack behind it) is only loaded once a report is actually built
+        from fpdf import FPDF
         pdf = FPDF()
         pdf.add_page()
         pdf.set_font("Arial", "B", 16)
@@ -95,68 +280,69 @@ def analyze_file(file_path):
         pdf.set_font("Arial", "", 11)
 
         # ---------- GRAPH GENERATION + TEXT ----------
-        numeric_cols = df.select_dtypes(include=['number']).columns
+        # Imported here so the Streamlit page doesn't pay for matplotlib until a report is drawn.
+        # A bare Figure renders through Agg without pyplot's global figure manager, and the one
+        # line-chart figure is cleared and reused for every column.
+        from matplotlib.figure import Figure
+        graph_fig = Figure(figsize=(8, 4))
+        ax = graph_fig.add_subplot()
         graph_paths = []
+        # Min/max for every numeric column in one reduction, read back per column below
+        num_stats = df[numeric_cols].agg(['min', 'max']) if numeric_count else None
+
+        # Every per-column count is read from the frame-level results above
+        total = len(df)
+        for col, series in df.items():
+            missing = na_counts[col]
+            missing_pct = missing_pcts[col]
+            unique = nunique[col]
+            samples = sample_values(series)
 
-        for col in df.columns:
-            total = len(df[col])
-            missing = df[col].isna().sum()
-            missing_pct = round((missing / total) * 100, 2)
-            unique = df[col].nunique(dropna=True)
-            samples = df[col].dropna().unique()[:5]
-
-            # Write column insights to README
-            with open(readme_path, "a", encoding="utf-8") as f:
-                f.write(f"Column Name: {col}\n")
-                f.write(f"Data Type: {df[col].dtype}\n")
-                f.write(f"Total Values: {total}\n")
-                f.write(f"Missing Values: {missing}\n")
-                f.write(f"Missing Percentage: {missing_pct}%\n")
-                f.write(f"Unique Values: {unique}\n")
-                f.write(f"Sample Values: {', '.join(map(str, samples))}\n")
-
-            # Write column insights to PDF
-            pdf.multi_cell(
-                0, 7,
+            # Column insights are formatted once and written to both README and PDF
+            insights = (
                 f"Column Name: {col}\n"
-                f"Data Type: {df[col].dtype}\n"
+                f"Data Type: {dtypes[col]}\n"
                 f"Total Values: {total}\n"
                 f"Missing Values: {missing}\n"
                 f"Missing Percentage: {missing_pct}%\n"
                 f"Unique Values: {unique}\n"
                 f"Sample Values: {', '.join(map(str, samples))}\n"
-                + "-" * 40
             )
+            readme.write(insights)
+            pdf.multi_cell(0, 7, insights + "-" * 40)
             pdf.ln(2)
 
             # Numeric columns: min/max + graph
-            if col in numeric_cols:
-                series = df[col]
-                min_value = series.min()
-                max_value = series.max()
-
-                # Line graph
-                plt.figure(figsize=(8, 4))
-                plt.plot(series, marker='o', label=col)
-                plt.axhline(min_value, color='red', linestyle='--', label=f'Min: {min_value}')
-                plt.axhline(max_value, color='green', linestyle='--', label=f'Max: {max_value}')
-                plt.title(f"{col} with Min & Max")
-                plt.xlabel("Index")
-                plt.ylabel(col)
-                plt.legend()
-                plt.grid(True)
-                plt.tight_layout()
+            if col in numeric_set:
+                min_value = num_stats.at['min', col]
+                max_value = num_stats.at['max', col]
+
+                # Line graph; a marker per row was the bulk of the draw time on long columns,
+                # and past ~2000 points extra vertices only overplot the same pixels
+                x_vals, y_vals = lttb_downsample(series.to_numpy(dtype=float, na_value=np.nan))
+                ax.clear()
+                ax.plot(x_vals, y_vals, label=col)
+                ax.axhline(min_value, color='red', linestyle='--', label=f'Min: {min_value}')
+                ax.axhline(max_value, color='green', linestyle='--', label=f'Max: {max_value}')
+                ax.set_title(f"{col} with Min & Max")
+                ax.set_xlabel("Index")
+                ax.set_ylabel(col)
+                ax.legend()
+                ax.grid(True)
+                graph_fig.tight_layout()
 
+                # Render once into memory: the PDF embeds the buffer, the README links the file copy
                 graph_file = f"output/{col}.png"
-                plt.savefig(graph_file)
-                plt.close()
+                graph_png = io.BytesIO()
+                graph_fig.savefig(graph_png, format="png", pil_kwargs=PNG_OPTIONS)
+                with open(graph_file, "wb") as f:
+                    f.write(graph_png.getvalue())
                 graph_paths.append(graph_file)
 
                 # Add min/max to README
-                with open(readme_path, "a", encoding="utf-8") as f:
-                    f.write(f"Minimum Value: {min_value}\n")
-                    f.write(f"Maximum Value: {max_value}\n")
-                    f.write(f"![{col}]({graph_file})\n\n")
+                readme.write(f"Minimum Value: {min_value}\n")
+                readme.write(f"Maximum Value: {max_value}\n")
+                readme.write(f"![{col}]({graph_file})\n\n")
 
                 # Add min/max + graph to PDF
                 pdf.set_font("Arial", "B", 12)
@@ -165,24 +351,44 @@ def analyze_file(file_path):
                 pdf.cell(0, 7, f"Minimum Value: {min_value}", ln=True)
                 pdf.cell(0, 7, f"Maximum Value: {max_value}", ln=True)
                 pdf.ln(2)
-                pdf.image(graph_file, x=10, y=None, w=180)
+                pdf.image(graph_png, x=10, y=None, w=180)
                 pdf.ln(5)
 
+        with open(readme_path, "w", encoding="utf-8") as f:
+            f.write(readme.getvalue())
+
         # ---------- CORRELATION HEATMAP ----------
         if len(numeric_cols) > 1:
-            plt.figure(figsize=(8, 6))
-            sns.heatmap(df[numeric_cols].corr(), annot=True, cmap="coolwarm", fmt=".2f")
-            plt.title("Correlation Heatmap")
+            corr = correlation_matrix(df[numeric_cols])
+            values = corr.to_numpy()
+            # Plain matplotlib image + labels; importing seaborn cost more than drawing the grid
+            heat_fig = Figure(figsize=(8, 6))
+            heat_ax = heat_fig.add_subplot()
+            image = heat_ax.imshow(values, cmap="coolwarm", aspect="auto")
+            heat_fig.colorbar(image, ax=heat_ax)
+            # One text artist per cell is O(N²); past 20 columns the labels are unreadable anyway
+            if len(corr) <= 20:
+                for i, j in zip(*np.where(~np.isnan(values))):
+                    heat_ax.text(j, i, f"{values[i, j]:.2f}", ha="center", va="center", fontsize=8)
+            heat_ax.set_xticks(range(len(corr)), corr.columns, rotation=90)
+            heat_ax.set_yticks(range(len(corr)), corr.index)
+            heat_ax.set_title("Correlation Heatmap")
+            heat_fig.tight_layout()
             heatmap_file = "output/correlation_heatmap.png"
-            plt.savefig(heatmap_file)
-            plt.close()
+            heatmap_png = io.BytesIO()
+            heat_fig.savefig(heatmap_png, format="png", pil_kwargs=PNG_OPTIONS)
+            with open(heatmap_file, "wb") as f:
+                f.write(heatmap_png.getvalue())
             pdf.set_font("Arial", "B", 14)
             pdf.cell(0, 10, "CORRELATION HEATMAP", ln=True)
-            pdf.image(heatmap_file, x=10, y=None, w=180)
+            pdf.image(heatmap_png, x=10, y=None, w=180)
             pdf.ln(5)
 
         # ---------- SAVE PDF ----------
-        pdf.output("output/report.pdf")
+        # Serialize once; the bytes go to disk and back to the caller without a re-read
+        pdf_bytes = bytes(pdf.output())
+        with open("output/report.pdf", "wb") as f:
+            f.write(pdf_bytes)
 
         return {
             "summary": summary,
@@ -193,7 +399,8 @@ def analyze_file(file_path):
             "categorical_count": categorical_count,
             "numeric_ratio": numeric_ratio,
             "categorical_ratio": categorical_ratio,
-            "warnings": warnings
+            "warnings": warnings,
+            "report_pdf": pdf_bytes
         }
 
     except Exception as e:
@@ -1,12 +1,94 @@
-import openai
+import os
+import asyncio
+import hashlib
+import tempfile
+from openai import OpenAI, AsyncOpenAI
 
-openai.api_key = "YOUR_API_KEY"
+# Key comes from the environment instead of living in source control
+API_KEY = os.environ.get("OPENAI_API_KEY")
+MODEL = "gpt-3.5-turbo"
+# Concurrent requests in summarize_many; keeps a large batch under the account rate limit
+MAX_CONCURRENT = 8
+# Summaries are stored per (model, text) so repeated prompts never reach the API again
+CACHE_DIR = "output/llm_cache"
+
+def build_messages(text):
+    return [
+        {"role": "user", "content": f"Explain this data:\n{text}"}
+    ]
+
+def cache_path(text):
+    key = hashlib.sha256(f"{MODEL}|{text}".encode("utf-8")).hexdigest()
+    return os.path.join(CACHE_DIR, f"{key}.txt")
+
+def read_cached(text):
+    path = cache_path(text)
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read()
+    return None
+
+def write_cached(text, summary):
+    # Refusals and tool calls come back with no content; nothing worth keeping
+    if summary is None:
+        return
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    # Write beside the target and rename, so a killed process never leaves a truncated summary
+    fd, tmp_path = tempfile.mkstemp(dir=CACHE_DIR, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(summary)
+        os.replace(tmp_path, cache_path(text))
+    except Exception:
+        os.remove(tmp_path)
+        raise
 
 def summarize(text):
-    response = openai.ChatCompletion.create(
-        model="gpt-3.5-turbo",
-        messages=[
-            {"role": "user", "content": f"Explain this data:\n{text}"}
-        ]
+    cached = read_cached(text)
+    if cached is not None:
+        return cached
+
+    client = OpenAI(api_key=API_KEY, max_retries=3)
+    response = client.chat.completions.create(
+        model=MODEL,
+        messages=build_messages(text)
     )
-    return response.choices[0].message.content
+    summary = response.choices[0].message.content
+    write_cached(text, summary)
+    return summary
+
+async def summarize_async(client, text, limit):
+    async with limit:
+        response = await client.chat.completions.create(
+            model=MODEL,
+            messages=build_messages(text)
+        )
+    summary = response.choices[0].message.content
+    # Stored as each response lands, so one failed request doesn't discard the rest of the batch
+    write_cached(text, summary)
+    return summary
+
+async def summarize_many_async(texts):
+    # Only distinct, uncached texts go out; requests overlap on the network, so the batch
+    # takes about as long as the slowest few
+    summaries = {text: read_cached(text) for text in dict.fromkeys(texts)}
+    missing = [text for text, summary in summaries.items() if summary is None]
+
+    if missing:
+        limit = asyncio.Semaphore(MAX_CONCURRENT)
+        async with AsyncOpenAI(api_key=API_KEY, max_retries=3) as client:
+            # Let every request finish (and cache) before a failure is raised
+            results = await asyncio.gather(
+                *(summarize_async(client, text, limit) for text in missing), return_exceptions=True
+            )
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+        for text, summary in zip(missing, results):
+            summaries[text] = summary
+    return [summaries[text] for text in texts]
+
+def summarize_many(texts):
+    # Sync entry point: asyncio.run starts its own loop, so it raises inside a running one
+    # (e.g. an async FastAPI handler); await summarize_many_async there instead
+    return asyncio.run(summarize_many_async(texts))